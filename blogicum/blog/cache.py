@@ -0,0 +1,34 @@
+from django.core.cache import cache
+from django.http import Http404
+
+from blog.models import Category
+
+# Версия хранится в CACHES['default']: чтобы сброс был виден всем
+# процессам сразу, нужен общий бэкенд (Redis, Memcached). С LocMemCache
+# другие процессы увидят изменения только по истечении таймаутов.
+CACHE_VERSION_KEY = 'blog:version'
+CATEGORY_CACHE_TIMEOUT = 60
+
+
+def get_cache_version():
+    return cache.get_or_set(CACHE_VERSION_KEY, 1, None)
+
+
+def invalidate_cache():
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CACHE_VERSION_KEY, 1, None)
+
+
+def get_published_category(slug):
+    category = cache.get_or_set(
+        f'blog:category:{get_cache_version()}:{slug}',
+        lambda: Category.objects.filter(
+            slug=slug, is_published=True
+        ).values('pk', 'title', 'description').first(),
+        CATEGORY_CACHE_TIMEOUT,
+    )
+    if category is None:
+        raise Http404
+    return category
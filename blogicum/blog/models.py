@@ -69,6 +69,12 @@ class Post(PublishedAndCreatedModel):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
+        indexes = (
+            models.Index(fields=('is_published', '-pub_date'),
+                         name='post_pub_idx'),
+            models.Index(fields=('category', 'is_published', '-pub_date'),
+                         name='post_category_pub_idx'),
+        )
 
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'pk': self.pk})
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from blog.cache import invalidate_cache
+from blog.models import Category, Comment, Location, Post, User
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def reset_blog_cache(**kwargs):
+    invalidate_cache()
+
+
+@receiver(post_save, sender=User)
+def reset_blog_cache_on_rename(update_fields=None, **kwargs):
+    if update_fields is None or 'username' in update_fields:
+        invalidate_cache()
@@ -1,10 +1,19 @@
+from functools import lru_cache
 from typing import Any, Dict
 
-from django.db.models.query import QuerySet, Q
-from django.db.models import Count
+from django.db.models.query import QuerySet
+from django.db.models import (
+    Count,
+    IntegerField,
+    OuterRef,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.views.decorators.cache import cache_page
 from django.views.generic import (
     CreateView,
     DetailView,
@@ -14,55 +23,113 @@ from django.views.generic import (
 )
 from django.contrib.auth.mixins import LoginRequiredMixin
 
-from blog.models import Category, Comment, Post, User
+from blog.cache import get_cache_version, get_published_category
+from blog.models import Comment, Post, User
 
 from blog.forms import CommentForm, PostForm
+from blog.paginators import CachedCountPaginator
+
+EMPTY_COMMENT_FORM = CommentForm()
+
+POST_LIST_CACHE_TIMEOUT = 60
+URL_CACHE_SIZE = 1024
+
+POST_CARD_FIELDS = (
+    "title",
+    "text",
+    "pub_date",
+    "image",
+    "is_published",
+    "author__username",
+    "category__title",
+    "category__slug",
+    "category__is_published",
+    "location__name",
+    "location__is_published",
+)
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def post_detail_url(pk):
+    return reverse("blog:post_detail", kwargs={"pk": pk})
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def profile_url(username):
+    return reverse("blog:profile", kwargs={"username": username})
+
+
+def comment_count():
+    comments = (
+        Comment.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    return Coalesce(Subquery(comments, output_field=IntegerField()), 0)
+
+
+POST_CARDS = (
+    Post.objects.select_related("author", "category", "location")
+    .only(*POST_CARD_FIELDS)
+    .annotate(comment_count=comment_count())
+    .order_by("-pub_date")
+)
 
 
 class PostMixin:
     model = Post
     paginate_by = 10
+    paginator_class = CachedCountPaginator
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args, cache_key=self.request.path, **kwargs
+        )
 
 
 class CommentMixin:
     model = Comment
     form_class = CommentForm
+    pk_url_kwarg = "comment_pk"
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(
-            Comment, pk=self.kwargs["comment_pk"],
-            post_id=self.kwargs["post_pk"]
-        )
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs["post_pk"])
 
     def get_success_url(self):
-        return reverse("blog:post_detail",
-                       kwargs={"pk": self.kwargs["post_pk"]})
+        return post_detail_url(self.kwargs["post_pk"])
 
 
 class DispatchMixin:
+    def get_object(self, queryset=None):
+        if getattr(self, "object", None) is None:
+            self.object = super().get_object(queryset)
+        return self.object
+
     def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
-            return redirect(
-                reverse('blog:post_detail',
-                        kwargs={'pk': self.get_object().pk}
-                        )
-            )
+        obj = self.get_object()
+        if obj.author_id != request.user.id:
+            return redirect(post_detail_url(obj.pk))
         return super().dispatch(request, *args, **kwargs)
 
 
 class PostListView(PostMixin, ListView):
 
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        return cache_page(
+            POST_LIST_CACHE_TIMEOUT,
+            key_prefix=f"blog:post_list:{get_cache_version()}",
+        )(super().dispatch)(request, *args, **kwargs)
+
     def get_queryset(self):
-        posts = Post.objects.prefetch_related(
-            "author", "category", "location"
-        ).filter(
+        return POST_CARDS.filter(
             pub_date__lt=timezone.now(),
             is_published=True,
             category__is_published=True,
-        ).annotate(
-            comment_count=Count("comments")
-        ).order_by("-pub_date")
-        return posts
+        )
 
 
 class PostCreateView(LoginRequiredMixin, CreateView):
@@ -74,25 +141,32 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
     def get_success_url(self) -> str:
-        return reverse("blog:profile", kwargs={
-            "username": self.request.user.username})
+        return profile_url(self.request.user.username)
 
 
 class PostDetailView(DetailView):
     model = Post
 
-    def get_object(self):
-        return get_object_or_404(
-            Post.objects.filter(
-                Q(is_published=True) | Q(author__username=self.request.user)
-            ),
+    def get_object(self, queryset=None):
+        post = get_object_or_404(
+            Post.objects.select_related("author", "category", "location"),
             pk=self.kwargs['pk'],
         )
+        is_owner = post.author_id == self.request.user.id
+        if not is_owner and (
+            not post.is_published
+            or (post.category_id and not post.category.is_published)
+            or post.pub_date > timezone.now()
+        ):
+            raise Http404
+        return post
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["form"] = CommentForm()
-        context["comments"] = self.object.comments.select_related("author")
+        context["form"] = EMPTY_COMMENT_FORM
+        context["comments"] = self.object.comments.values(
+            "id", "text", "created_at", "author_id", "author__username"
+        ).order_by("created_at")
         return context
 
 
@@ -123,7 +197,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
     def get_success_url(self):
-        return reverse("blog:post_detail", kwargs={"pk": self.kwargs["pk"]})
+        return post_detail_url(self.kwargs["pk"])
 
 
 class CommentUpdateView(CommentMixin,
@@ -145,19 +219,12 @@ class CategoryListView(PostMixin, ListView):
     context_object_name = "page_obj"
 
     def get_queryset(self) -> QuerySet[Any]:
-        self.category = get_object_or_404(Category,
-                                          slug=self.kwargs["category_slug"],
-                                          is_published=True)
-        return (
-            Post.objects.select_related("category")
-            .filter(category=self.category,
-                    pub_date__lt=timezone.now(),
-                    category__is_published=True,
-                    is_published=True,
-                    )
-            .annotate(comment_count=Count("comments"))
-            .order_by("-pub_date")
-            .all()
+        self.category = get_published_category(self.kwargs["category_slug"])
+        return POST_CARDS.filter(
+            category_id=self.category["pk"],
+            pub_date__lt=timezone.now(),
+            is_published=True,
+            category__is_published=True,
         )
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
@@ -172,14 +239,7 @@ class ProfileView(PostMixin, ListView):
 
     def get_queryset(self):
         self.author = get_object_or_404(User, username=self.kwargs['username'])
-        return (
-            Post.objects.select_related("author", "category", "location")
-            .filter(
-                author=self.author,
-            )
-            .annotate(comment_count=Count("comments"))
-            .order_by("-pub_date")
-        )
+        return POST_CARDS.filter(author=self.author)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -198,15 +258,12 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     ]
 
     def get_success_url(self) -> str:
-        return reverse_lazy('blog:profile',
-                            kwargs={'username': self.object.username})
+        return profile_url(self.object.username)
 
     def get_object(self, queryset=None):
         return get_object_or_404(User, username=self.kwargs.get('username'))
 
     def form_valid(self, form):
-        user = form.save(commit=False)
-        user.username = form.cleaned_data.get('username')
-        self.request.user = user
-        user.save()
+        self.object = form.save(commit=False)
+        self.object.save(update_fields=self.fields)
         return redirect(self.get_success_url())